@@ -7,11 +7,13 @@ Implementa métricas para avaliar a qualidade da documentação gerada.
 
 import os
 import re
+import ast
 import json
 import logging
-from typing import Dict, List, Tuple, Any, Optional
+from collections import Counter
+from typing import Callable, Dict, FrozenSet, List, Tuple, Any, Optional
 import nltk
-from nltk.tokenize import sent_tokenize, word_tokenize
+from nltk.tokenize import sent_tokenize
 from nltk.translate.bleu_score import sentence_bleu, SmoothingFunction
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
@@ -27,12 +29,127 @@ logger = logging.getLogger(__name__)
 # Constantes
 DEFAULT_MODEL = "gpt-4"
 MAX_TOKENS = 4096
+WORD_RE = re.compile(r"\w+")
+IDENTIFIER_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+BLEU_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+BLEU_MAX_ORDER = 4
+CODE_ELEMENT_RE = re.compile(r"\b(?:def|class|function|func|fn)\s+([A-Za-z_][A-Za-z0-9_]*)")
+PY_ELEMENT_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+# Palavras de controle que as expressões de métodos em C/Java poderiam confundir com nomes
+CONTROL_KEYWORDS = frozenset({"if", "for", "while", "switch", "catch", "return", "sizeof", "new"})
+
+
+def _py_ast_elements(code: str) -> FrozenSet[str]:
+    """
+    Extrai nomes de funções, métodos e classes de código Python via AST.
+    
+    Args:
+        code: Código fonte Python.
+        
+    Returns:
+        Conjunto com os nomes encontrados.
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        # Código inválido ou truncado: recorre à busca por expressão regular
+        return frozenset(CODE_ELEMENT_RE.findall(code))
+    return frozenset(node.name for node in ast.walk(tree) if isinstance(node, PY_ELEMENT_NODES))
+
+
+def _regex_extractor(pattern: str, flags: int = 0) -> Callable[[str], FrozenSet[str]]:
+    """
+    Cria um extrator de elementos a partir de uma expressão regular.
+    
+    Args:
+        pattern: Expressão regular em que cada alternativa captura o nome do elemento em um grupo.
+        flags: Flags de compilação da expressão.
+        
+    Returns:
+        Função que recebe o código e retorna o conjunto de nomes encontrados.
+    """
+    regex = re.compile(pattern, flags)
+    
+    def extract(code: str) -> FrozenSet[str]:
+        # Com alternativas, cada casamento traz um único grupo preenchido
+        names = frozenset(next(g for g in match.groups() if g) for match in regex.finditer(code))
+        return names - CONTROL_KEYWORDS
+    
+    return extract
+
+
+_js_elements = _regex_extractor(r"\b(?:function\*?|class)\s+([A-Za-z_$][\w$]*)")
+_ts_elements = _regex_extractor(r"\b(?:function\*?|class|interface|enum|type)\s+([A-Za-z_$][\w$]*)")
+_jvm_elements = _regex_extractor(
+    r"\b(?:class|interface|enum|record|struct)\s+(\w+)"
+    r"|^[ \t]*(?:[\w<>\[\],.?]+[ \t]+)+(\w+)[ \t]*\([^;{)]*\)[^;{]*\{",
+    re.MULTILINE
+)
+_c_elements = _regex_extractor(
+    r"\b(?:class|struct)\s+(\w+)"
+    r"|^[ \t]*(?:[\w:<>*&]+[ \t*&]+)+(\w+)[ \t]*\([^;{)]*\)[^;{]*\{",
+    re.MULTILINE
+)
+
+# Extratores de elementos de código por linguagem (nomes usados em SUPPORTED_LANGUAGES)
+LANG_EXTRACTOR: Dict[str, Callable[[str], FrozenSet[str]]] = {
+    "Python": _py_ast_elements,
+    "JavaScript": _js_elements,
+    "JavaScript (React)": _js_elements,
+    "TypeScript": _ts_elements,
+    "TypeScript (React)": _ts_elements,
+    "Java": _jvm_elements,
+    "C#": _jvm_elements,
+    "C++": _c_elements,
+    "C": _c_elements,
+    "Go": _regex_extractor(r"\bfunc\s+(?:\([^)]*\)\s*)?(\w+)|\btype\s+(\w+)\s+(?:struct|interface)\b"),
+    "Ruby": _regex_extractor(r"\b(?:def|class|module)\s+(?:self\.)?(\w+[?!]?)"),
+    "PHP": _regex_extractor(r"\b(?:function|class|interface|trait)\s+(\w+)"),
+    "Swift": _regex_extractor(r"\b(?:func|class|struct|enum|protocol)\s+(\w+)"),
+    "Kotlin": _regex_extractor(r"\b(?:fun|class|interface|object)\s+(?:<[^>]*>\s*)?(?:[\w<>, ?]+\.)?(\w+)"),
+    "Rust": _regex_extractor(r"\b(?:fn|struct|enum|trait)\s+(\w+)"),
+}
+
+def _ensure_nltk_resource(resource: str, package: str) -> None:
+    """
+    Baixa um recurso do NLTK caso ele ainda não esteja disponível.
+    
+    Args:
+        resource: Caminho do recurso (ex.: 'tokenizers/punkt').
+        package: Nome do pacote a ser baixado (ex.: 'punkt').
+    """
+    try:
+        nltk.data.find(resource)
+    except LookupError:
+        nltk.download(package)
+
 
 # Ensure NLTK dependencies are downloaded
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+_ensure_nltk_resource('tokenizers/punkt', 'punkt')
+
+
+def _load_sentence_tokenizer():
+    """
+    Carrega o tokenizador de sentenças Punkt para inglês.
+    
+    Returns:
+        Tokenizador Punkt ou None se os dados não estiverem disponíveis.
+    """
+    try:
+        try:
+            from nltk.tokenize import PunktTokenizer  # NLTK >= 3.8.2
+        except ImportError:
+            return nltk.data.load("tokenizers/punkt/english.pickle")
+        # A partir do NLTK 3.8.2 os parâmetros do Punkt vêm do pacote punkt_tab
+        _ensure_nltk_resource('tokenizers/punkt_tab', 'punkt_tab')
+        return PunktTokenizer("english")
+    except LookupError as e:
+        logger.warning(f"Tokenizador Punkt indisponível: {str(e)}")
+        return None
+
+
+# Carregado uma única vez, em vez de a cada chamada de sent_tokenize
+_PUNKT = _load_sentence_tokenizer()
 
 class DocEvaluator:
     """
@@ -64,29 +181,36 @@ class DocEvaluator:
         
         logger.info(f"DocEvaluator inicializado com modelo {model}")
     
-    def evaluate_completeness(self, code: str, documentation: str) -> float:
+    def evaluate_completeness(self, code: str, documentation: str, language: Optional[str] = None) -> float:
         """
         Avalia o quão completa é a documentação em relação ao código.
         
         Args:
             code: Código fonte.
             documentation: Documentação gerada.
+            language: Linguagem do código (ex.: "Python"), se conhecida.
             
         Returns:
             Pontuação de completude (0-1).
         """
-        # Extrai funções, classes e métodos do código (implementação simplificada)
-        code_elements = self._extract_code_elements(code)
-        
-        # Verifica quais elementos foram mencionados na documentação
-        mentioned_count = 0
-        for element in code_elements:
-            if element.lower() in documentation.lower():
-                mentioned_count += 1
+        # Extrai funções, classes e métodos do código
+        code_elements = self._extract_code_elements(code, language)
         
         # Calcula a pontuação de completude
         if not code_elements:
             return 1.0  # Se não há elementos, a documentação é completa por definição
+        
+        # Normaliza a documentação uma única vez e indexa seus identificadores
+        doc_low = documentation.lower()
+        doc_tokens = set(IDENTIFIER_RE.findall(doc_low))
+        
+        # Verifica quais elementos foram mencionados na documentação; a busca por
+        # substring só é feita quando o elemento não aparece como identificador
+        mentioned_count = 0
+        for element in code_elements:
+            element_low = element.lower()
+            if element_low in doc_tokens or element_low in doc_low:
+                mentioned_count += 1
             
         completeness_score = mentioned_count / len(code_elements)
         return completeness_score
@@ -101,15 +225,18 @@ class DocEvaluator:
         Returns:
             Pontuação de clareza (0-1).
         """
-        # Tokeniza a documentação em sentenças e palavras
-        sentences = sent_tokenize(documentation)
-        words = word_tokenize(documentation)
+        # Conta sentenças e palavras da documentação
+        if _PUNKT is not None:
+            n_sentences = len(_PUNKT.tokenize(documentation))
+        else:
+            n_sentences = len(sent_tokenize(documentation))
+        n_words = sum(1 for _ in WORD_RE.finditer(documentation))
         
-        if not sentences or not words:
+        if not n_sentences or not n_words:
             return 0.0
         
         # Calcula o comprimento médio das sentenças
-        avg_sentence_length = len(words) / len(sentences)
+        avg_sentence_length = n_words / n_sentences
         
         # Calcula a pontuação de clareza baseada no comprimento das sentenças
         # Sentenças muito longas podem ser difíceis de entender
@@ -117,6 +244,72 @@ class DocEvaluator:
         
         return clarity_score
     
-    def evaluate_accuracy(self, code: str, documentation: str) -> float:
+    def evaluate_bleu_batch(self, hyps: List[str], refs: List[str]) -> np.ndarray:
+        """
+        Calcula o BLEU de várias documentações de uma só vez.
+        
+        Equivale a aplicar sentence_bleu com pesos uniformes e
+        SmoothingFunction().method1 a cada par, mas conta os n-gramas sobre
+        identificadores inteiros e faz o restante do cálculo com numpy.
+        
+        Args:
+            hyps: Documentações geradas.
+            refs: Documentações de referência, uma para cada documentação gerada.
+            
+        Returns:
+            Array com a pontuação BLEU (0-1) de cada par.
+        """
+        if len(hyps) != len(refs):
+            raise ValueError("hyps e refs devem ter o mesmo tamanho")
+        
+        # Tokeniza e mapeia cada token para um identificador inteiro
+        vocab: Dict[str, int] = {}
+        def to_ids(text: str) -> Tuple[int, ...]:
+            return tuple(vocab.setdefault(tok, len(vocab)) for tok in BLEU_TOKEN_RE.findall(text.lower()))
+        
+        hyp_ids = [to_ids(h) for h in hyps]
+        ref_ids = [to_ids(r) for r in refs]
+        
+        matches = np.zeros((len(hyps), BLEU_MAX_ORDER))
+        totals = np.zeros((len(hyps), BLEU_MAX_ORDER))
+        for i, (hyp, ref) in enumerate(zip(hyp_ids, ref_ids)):
+            for n in range(1, BLEU_MAX_ORDER + 1):
+                hyp_ngrams = Counter(zip(*(hyp[k:] for k in range(n))))
+                ref_ngrams = Counter(zip(*(ref[k:] for k in range(n))))
+                # A interseção de Counters já aplica o clipping das contagens
+                matches[i, n - 1] = sum((hyp_ngrams & ref_ngrams).values())
+                totals[i, n - 1] = sum(hyp_ngrams.values())
+        
+        # Suavização method1: precisões nulas recebem epsilon no numerador
+        epsilon = SmoothingFunction().epsilon
+        precisions = np.where(matches > 0, matches, epsilon) / np.maximum(totals, 1)
+        scores = np.exp(np.log(precisions).mean(axis=1))
+        
+        # Penalidade de brevidade
+        hyp_len = np.array([len(h) for h in hyp_ids], dtype=float)
+        ref_len = np.array([len(r) for r in ref_ids], dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            brevity_penalty = np.where(hyp_len > ref_len, 1.0, np.exp(1 - ref_len / hyp_len))
+        
+        # Sem nenhum unigrama em comum a pontuação é zero, como no NLTK
+        return np.where((matches[:, 0] > 0) & (hyp_len > 0), scores * brevity_penalty, 0.0)
+    
+    def _extract_code_elements(self, code: str, language: Optional[str] = None) -> FrozenSet[str]:
+        """
+        Extrai nomes de funções, classes e métodos do código.
+        
+        Python é analisado via AST; as demais linguagens usam uma expressão
+        regular pré-compilada por linguagem.
+        
+        Args:
+            code: Código fonte.
+            language: Linguagem do código. Se None ou desconhecida, usa uma
+                busca genérica por palavras-chave.
+            
+        Returns:
+            Conjunto com os nomes dos elementos encontrados.
         """
-        Av
+        extractor = LANG_EXTRACTOR.get(language)
+        if extractor is None:
+            return frozenset(CODE_ELEMENT_RE.findall(code))
+        return extractor(code)
@@ -6,13 +6,39 @@ Este módulo contém a implementação principal do gerador de documentação.
 """
 
 import os
+import ast
 import json
+import asyncio
+import hashlib
 import logging
-from typing import Dict, List, Tuple, Optional, Union
+import tempfile
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional, Union
+import httpx
 import openai
 from pathlib import Path
 import tiktoken
 import re
+try:
+    import markdown
+except ImportError:
+    markdown = None
+try:
+    import h2  # noqa: F401  (necessário para HTTP/2 no httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
 
 # Configuração de logging
 logging.basicConfig(
@@ -25,6 +51,23 @@ logger = logging.getLogger(__name__)
 DEFAULT_MODEL = "gpt-4"
 MAX_TOKENS = 4096
 DEFAULT_TEMPERATURE = 0.2
+DEFAULT_MAX_CONCURRENCY = 8
+# Agrupamento desativado por padrão: exige um modelo com suporte a JSON mode (ex.: gpt-4o)
+DEFAULT_FILES_PER_REQUEST = 1
+# Orçamento de tokens de código para agrupar vários arquivos em uma única requisição
+PACK_TOKEN_BUDGET = MAX_TOKENS - 2000
+# Estimativa da documentação de um arquivo agrupado: base fixa + tokens do código.
+# A soma das estimativas do grupo precisa caber em MAX_TOKENS, que é compartilhado pela resposta
+PACKED_DOC_BASE_TOKENS = 400
+PACKED_CACHE_VARIANT = "multi-file"
+DEFAULT_EXCLUDE_DIRS = ['.git', 'node_modules', 'venv', '__pycache__', 'dist', 'build']
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_INTERVAL = 60
+BATCH_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+DEFAULT_CACHE_DIR = "~/.cache/codedocgen"
+# Incrementar quando o prompt mudar, para invalidar o cache existente
+PROMPT_TEMPLATE_VERSION = 1
+SYSTEM_PROMPT = "Você é um assistente especializado em gerar documentação técnica de alta qualidade para código-fonte."
 SUPPORTED_LANGUAGES = {
     ".py": "Python",
     ".js": "JavaScript",
@@ -43,6 +86,378 @@ SUPPORTED_LANGUAGES = {
     ".rs": "Rust"
 }
 OUTPUT_FORMATS = ["markdown", "html", "pdf"]
+MARKDOWN_EXTENSIONS = ["fenced_code", "tables"]
+# Limites usados ao compactar código que excede o orçamento de tokens
+LONG_STRING_LIMIT = 200
+MINIFIED_LINE_LENGTH = 1000
+# Linguagens cujos comentários de bloco usam a sintaxe /* ... */
+C_STYLE_COMMENT_LANGUAGES = {
+    "JavaScript", "JavaScript (React)", "TypeScript", "TypeScript (React)", "Java", "C#",
+    "C++", "C", "Go", "PHP", "Swift", "Kotlin", "Rust"
+}
+BLANK_LINES_RE = re.compile(r"\n{3,}")
+TRAILING_WHITESPACE_RE = re.compile(r"[ \t]+$", re.MULTILINE)
+# Literais de texto e comentários de linha são casados junto com os comentários
+# de bloco para que "/*" dentro deles não seja tratado como início de comentário
+BLOCK_COMMENT_RE = re.compile(
+    r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`(?:\\.|[^`\\])*`|//[^\n]*|/\*.*?\*/',
+    re.DOTALL
+)
+# "using" só é importação quando termina em ";" (em C# também abre blocos using (...) { ... })
+IMPORT_LINE_RE = re.compile(r"^\s*(?:(?:import|from|#include|require|use)\b|using\b.*;\s*$)")
+# Linhas que podem aparecer no cabeçalho de importações sem encerrá-lo
+HEADER_LINE_RE = re.compile(r"^\s*(?:$|//|/\*|\*|#|package\b|namespace\b.*;\s*$)")
+FALLBACK_ENCODING = "cl100k_base"
+PREWARM_ENCODINGS = ("cl100k_base", "o200k_base")
+TOKEN_CACHE_SIZE = 4096
+# Número de arquivos lidos e tokenizados de uma vez ao percorrer um projeto
+TOKENIZE_BATCH_SIZE = 64
+MAX_RETRY_ATTEMPTS = 6
+# Conexões HTTP compartilhadas entre todas as requisições ao LLM
+HTTP_MAX_CONNECTIONS = 64
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+HTTP_TIMEOUT = 120.0
+HTTP_CONNECT_TIMEOUT = 10.0
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+@lru_cache(maxsize=None)
+def _get_encoder(model: str) -> "tiktoken.Encoding":
+    """
+    Obtém o codificador de tokens para um modelo, compartilhado entre instâncias.
+    
+    Args:
+        model: Nome do modelo LLM.
+        
+    Returns:
+        Codificador tiktoken do modelo.
+    """
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        # Fallback para o codificador cl100k_base que é usado pelo GPT-4
+        return tiktoken.get_encoding(FALLBACK_ENCODING)
+
+
+# Conversor Markdown compartilhado; reset() é bem mais barato que recriá-lo a cada chamada
+_markdown_converter = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS) if markdown is not None else None
+_markdown_lock = threading.Lock()
+
+
+def _markdown_to_html(markdown_doc: str) -> str:
+    """
+    Converte Markdown para HTML usando o conversor compartilhado.
+    
+    Args:
+        markdown_doc: Documentação em formato Markdown.
+        
+    Returns:
+        Documentação em HTML.
+    """
+    if _markdown_converter is None:
+        logger.warning("Biblioteca 'markdown' não encontrada. Instalando: pip install markdown")
+        raise ImportError("Biblioteca 'markdown' não encontrada")
+    
+    with _markdown_lock:
+        _markdown_converter.reset()
+        return _markdown_converter.convert(markdown_doc)
+
+
+class _PythonOutliner(ast.NodeTransformer):
+    """
+    Reduz um módulo Python às assinaturas de classes e funções, mantendo
+    apenas a primeira linha de cada docstring.
+    """
+    
+    def _outline_function(self, node):
+        docstring = ast.get_docstring(node)
+        body = []
+        lines = docstring.strip().splitlines() if docstring else []
+        if lines:
+            body.append(ast.Expr(ast.Constant(lines[0])))
+        body.append(ast.Expr(ast.Constant(Ellipsis)))
+        node.body = body
+        return node
+    
+    visit_FunctionDef = _outline_function
+    visit_AsyncFunctionDef = _outline_function
+    
+    def visit_ClassDef(self, node):
+        docstring = ast.get_docstring(node)
+        self.generic_visit(node)
+        lines = docstring.strip().splitlines() if docstring else []
+        if lines:
+            node.body[0] = ast.Expr(ast.Constant(lines[0]))
+        return node
+    
+    def visit_Constant(self, node):
+        # Literais de texto muito longos são substituídos por um marcador
+        if isinstance(node.value, (str, bytes)) and len(node.value) > LONG_STRING_LIMIT:
+            return ast.copy_location(ast.Constant(b"..." if isinstance(node.value, bytes) else "..."), node)
+        return node
+
+
+def _strip_block_comment(match: "re.Match") -> str:
+    """Remove comentários de bloco, preservando literais de texto e comentários de linha."""
+    token = match.group(0)
+    return "" if token.startswith("/*") else token
+
+
+def _python_outline(code: str) -> Optional[str]:
+    """
+    Gera uma versão resumida de código Python (assinaturas e docstrings).
+    
+    Args:
+        code: Código fonte Python.
+        
+    Returns:
+        Código resumido ou None se o código não puder ser analisado.
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+    
+    # Remove importações repetidas
+    seen_imports = set()
+    body = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            dump = ast.dump(node)
+            if dump in seen_imports:
+                continue
+            seen_imports.add(dump)
+        body.append(node)
+    tree.body = body
+    
+    return ast.unparse(_PythonOutliner().visit(tree))
+
+
+@lru_cache(maxsize=None)
+def _require_weasyprint() -> None:
+    """
+    Verifica, uma única vez, se a biblioteca weasyprint está disponível.
+    """
+    from weasyprint import HTML  # noqa: F401
+
+
+# Cache LRU de contagens de tokens, indexado pelo hash do texto para não guardar o
+# texto nem os tokens; quem precisa dos tokens (ex.: truncamento) tokeniza de novo
+_token_cache: "OrderedDict[Tuple[str, bytes], int]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+
+def _token_cache_key(encoder: "tiktoken.Encoding", text: str) -> Tuple[str, bytes]:
+    return (encoder.name, hashlib.blake2b(text.encode("utf-8")).digest())
+
+
+def _count_tokens_cached(encoder: "tiktoken.Encoding", text: str) -> int:
+    """
+    Conta os tokens de um texto reutilizando o resultado de chamadas anteriores.
+    
+    Args:
+        encoder: Codificador tiktoken.
+        text: Texto a ser contado.
+        
+    Returns:
+        Número de tokens do texto.
+    """
+    key = _token_cache_key(encoder, text)
+    with _token_cache_lock:
+        count = _token_cache.get(key)
+        if count is not None:
+            _token_cache.move_to_end(key)
+            return count
+    
+    # encode_ordinary trata tokens especiais (ex.: <|endoftext|>) como texto comum
+    count = len(encoder.encode_ordinary(text))
+    with _token_cache_lock:
+        _token_cache[key] = count
+        if len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    return count
+
+
+def _prime_token_cache(encoder: "tiktoken.Encoding", texts: List[str]) -> None:
+    """
+    Conta os tokens de vários textos de uma vez e guarda as contagens no cache.
+    
+    Usa encode_ordinary_batch, que processa os textos em paralelo fora do GIL,
+    em vez de um laço Python chamando encode para cada texto.
+    
+    Args:
+        encoder: Codificador tiktoken.
+        texts: Textos a serem tokenizados.
+    """
+    missing = {}
+    with _token_cache_lock:
+        for text in texts:
+            key = _token_cache_key(encoder, text)
+            if key not in _token_cache:
+                missing[key] = text
+    
+    if not missing:
+        return
+    
+    batches = encoder.encode_ordinary_batch(list(missing.values()), num_threads=os.cpu_count() or 1)
+    with _token_cache_lock:
+        for key, tokens in zip(missing, batches):
+            _token_cache[key] = len(tokens)
+        while len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+
+
+def _fits_by_bytes(text: str, max_tokens: int) -> bool:
+    """
+    Indica se um texto certamente cabe no limite de tokens sem tokenizá-lo.
+    
+    Todo token BPE corresponde a pelo menos um byte, então textos com até
+    max_tokens bytes em UTF-8 certamente cabem no limite.
+    """
+    # len(text) é um limite inferior barato para o tamanho em bytes
+    return len(text) <= max_tokens and len(text.encode("utf-8")) <= max_tokens
+
+
+def _normalize_whitespace(code: str) -> str:
+    """
+    Remove espaços no fim das linhas e linhas em branco repetidas.
+    
+    Args:
+        code: Código fonte.
+        
+    Returns:
+        Código normalizado.
+    """
+    code = TRAILING_WHITESPACE_RE.sub("", code)
+    return BLANK_LINES_RE.sub("\n\n", code)
+
+
+_exponential_wait = wait_random_exponential(min=1, max=60)
+
+
+def _retry_wait(retry_state) -> float:
+    """
+    Calcula a espera antes de uma nova tentativa, respeitando o cabeçalho
+    Retry-After quando a API o envia.
+    
+    Args:
+        retry_state: Estado da tentativa fornecido pelo tenacity.
+        
+    Returns:
+        Tempo de espera em segundos.
+    """
+    error = retry_state.outcome.exception()
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(60.0, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    return _exponential_wait(retry_state)
+
+
+def _log_retry(retry_state) -> None:
+    """
+    Registra no log cada nova tentativa de chamada ao LLM.
+    
+    Args:
+        retry_state: Estado da tentativa fornecido pelo tenacity.
+    """
+    logger.warning(
+        f"Erro transitório na API do LLM ({retry_state.outcome.exception()!r}). "
+        f"Tentativa {retry_state.attempt_number}/{MAX_RETRY_ATTEMPTS}, "
+        f"nova tentativa em {retry_state.next_action.sleep:.1f}s."
+    )
+
+
+_llm_retry = retry(
+    wait=_retry_wait,
+    stop=stop_after_attempt(MAX_RETRY_ATTEMPTS),
+    retry=retry_if_exception_type(RETRYABLE_ERRORS),
+    before_sleep=_log_retry,
+    reraise=True,
+)
+
+
+# Pré-carrega os codificadores mais comuns (o tiktoken mantém seu próprio cache)
+for _encoding_name in PREWARM_ENCODINGS:
+    try:
+        tiktoken.get_encoding(_encoding_name)
+    except Exception as e:
+        logger.debug(f"Não foi possível pré-carregar o codificador {_encoding_name}: {str(e)}")
+
+
+class TokenBucket:
+    """
+    Limitador preventivo de requisições e tokens por minuto para a API do LLM.
+    
+    Mantém dois baldes que se reabastecem continuamente (RPM e TPM). Cada
+    requisição aguarda, em ordem de chegada, até que ambos tenham saldo
+    suficiente, evitando erros 429 em vez de reagir a eles.
+    """
+    
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None):
+        """
+        Inicializa o limitador.
+        
+        Args:
+            rpm: Limite de requisições por minuto (None para não limitar).
+            tpm: Limite de tokens por minuto (None para não limitar).
+        """
+        if (rpm is not None and rpm <= 0) or (tpm is not None and tpm <= 0):
+            raise ValueError("rpm e tpm devem ser maiores que zero")
+        
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm or 0)
+        self._tokens = float(tpm or 0)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+    
+    async def acquire(self, est_tokens: int) -> None:
+        """
+        Aguarda até que haja saldo para uma requisição com a estimativa de tokens dada.
+        
+        Args:
+            est_tokens: Estimativa de tokens da requisição (prompt + resposta).
+        """
+        if self.tpm:
+            # Uma requisição nunca pode exigir mais que a capacidade do balde
+            est_tokens = min(est_tokens, self.tpm)
+        
+        # O lock é mantido durante a espera para atender as requisições em ordem
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = 0.0
+                if self.rpm and self._requests < 1:
+                    wait = max(wait, (1 - self._requests) * 60 / self.rpm)
+                if self.tpm and self._tokens < est_tokens:
+                    wait = max(wait, (est_tokens - self._tokens) * 60 / self.tpm)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            
+            if self.rpm:
+                self._requests -= 1
+            if self.tpm:
+                self._tokens -= est_tokens
+
 
 class DocGenerator:
     """
@@ -55,7 +470,13 @@ class DocGenerator:
         model: str = DEFAULT_MODEL,
         temperature: float = DEFAULT_TEMPERATURE,
         api_key: Optional[str] = None,
-        output_format: str = "markdown"
+        output_format: str = "markdown",
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        files_per_request: int = DEFAULT_FILES_PER_REQUEST,
+        use_cache: bool = True,
+        cache_dir: Optional[str] = None,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None
     ):
         """
         Inicializa o gerador de documentação.
@@ -65,14 +486,39 @@ class DocGenerator:
             temperature: Temperatura para geração (0.0-1.0).
             api_key: Chave de API para o serviço LLM.
             output_format: Formato de saída da documentação.
+            max_concurrency: Número máximo de requisições simultâneas ao LLM em generate_project.
+            files_per_request: Número máximo de arquivos pequenos documentados em uma
+                mesma requisição em generate_project (1 desativa o agrupamento). Valores
+                maiores exigem um modelo com suporte a response_format json_object.
+            use_cache: Reutiliza documentações já geradas para o mesmo código.
+            cache_dir: Diretório do cache em disco (padrão: ~/.cache/codedocgen).
+            requests_per_minute: Limite de requisições por minuto da conta, aplicado
+                preventivamente em generate_project (None para não limitar).
+            tokens_per_minute: Limite de tokens por minuto da conta, aplicado
+                preventivamente em generate_project (None para não limitar).
         """
         self.model = model
         self.temperature = temperature
         self.output_format = output_format.lower()
+        self.max_concurrency = max_concurrency
+        self.files_per_request = files_per_request
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._client = None
+        self._aclient = None
+        self._rate_limiter = None
+        self.use_cache = use_cache
+        self._cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR).expanduser()
         
         if self.output_format not in OUTPUT_FORMATS:
             raise ValueError(f"Formato de saída '{output_format}' não suportado. Use um dos seguintes: {', '.join(OUTPUT_FORMATS)}")
         
+        if self.max_concurrency < 1:
+            raise ValueError("max_concurrency deve ser maior ou igual a 1")
+        
+        if self.files_per_request < 1:
+            raise ValueError("files_per_request deve ser maior ou igual a 1")
+        
         # Configura a API key
         if api_key:
             openai.api_key = api_key
@@ -82,11 +528,7 @@ class DocGenerator:
             logger.warning("Nenhuma API key fornecida. Use api_key ou defina OPENAI_API_KEY no ambiente.")
         
         # Inicializa o codificador de tokens
-        try:
-            self.tokenizer = tiktoken.encoding_for_model(self.model)
-        except:
-            # Fallback para o codificador cl100k_base que é usado pelo GPT-4
-            self.tokenizer = tiktoken.get_encoding("cl100k_base")
+        self.tokenizer = _get_encoder(self.model)
             
         logger.info(f"DocGenerator inicializado com modelo {model} e temperatura {temperature}")
         
@@ -113,7 +555,73 @@ class DocGenerator:
         Returns:
             Número de tokens.
         """
-        return len(self.tokenizer.encode(text))
+        return _count_tokens_cached(self.tokenizer, text)
+    
+    def _within_token_limit(self, text: str, max_tokens: int) -> bool:
+        """
+        Verifica se um texto cabe no limite de tokens, evitando a tokenização
+        quando possível.
+        
+        Args:
+            text: Texto a ser verificado.
+            max_tokens: Número máximo de tokens permitidos.
+            
+        Returns:
+            True se o texto não excede o limite.
+        """
+        if _fits_by_bytes(text, max_tokens):
+            return True
+        return self._count_tokens(text) <= max_tokens
+    
+    def _compact_code(self, code: str, language: str, max_tokens: int = MAX_TOKENS-1000) -> str:
+        """
+        Remove redundâncias do código antes de enviá-lo ao LLM.
+        
+        Espaços no fim das linhas e linhas em branco repetidas são sempre
+        removidos. Se o código ainda exceder o limite de tokens, Python é
+        reduzido a assinaturas e docstrings; nas demais linguagens são
+        removidos comentários de bloco, importações repetidas e linhas
+        minificadas.
+        
+        Args:
+            code: Código fonte.
+            language: Linguagem de programação do código.
+            max_tokens: Número máximo de tokens desejado.
+            
+        Returns:
+            Código compactado.
+        """
+        code = _normalize_whitespace(code)
+        if self._within_token_limit(code, max_tokens):
+            return code
+        
+        if language == "Python":
+            outline = _python_outline(code)
+            if outline is not None:
+                logger.info("Código excede o limite de tokens. Mantendo apenas assinaturas e docstrings.")
+                return outline
+        
+        if language in C_STYLE_COMMENT_LANGUAGES:
+            code = BLOCK_COMMENT_RE.sub(_strip_block_comment, code)
+        
+        # Importações repetidas só são removidas no cabeçalho do arquivo
+        in_header = True
+        seen_imports = set()
+        lines = []
+        for line in code.splitlines():
+            if len(line) > MINIFIED_LINE_LENGTH:
+                # Provavelmente código minificado ou dados embutidos
+                continue
+            if in_header:
+                if IMPORT_LINE_RE.match(line):
+                    if line.strip() in seen_imports:
+                        continue
+                    seen_imports.add(line.strip())
+                elif not HEADER_LINE_RE.match(line):
+                    in_header = False
+            lines.append(line)
+        
+        return BLANK_LINES_RE.sub("\n\n", "\n".join(lines))
     
     def _truncate_code(self, code: str, max_tokens: int = MAX_TOKENS-1000) -> str:
         """
@@ -126,12 +634,14 @@ class DocGenerator:
         Returns:
             Código truncado se necessário.
         """
-        tokens = self.tokenizer.encode(code)
-        if len(tokens) <= max_tokens:
+        if self._within_token_limit(code, max_tokens):
             return code
         
+        # O cache guarda apenas contagens; os tokens são necessários para cortar o texto
+        tokens = self.tokenizer.encode_ordinary(code)
+        
         logger.warning(f"Código excede o limite de tokens. Truncando de {len(tokens)} para {max_tokens} tokens.")
-        truncated_tokens = tokens[:max_tokens]
+        truncated_tokens = list(tokens[:max_tokens])
         truncated_code = self.tokenizer.decode(truncated_tokens)
         return truncated_code + "\n\n# [Código truncado devido a limitações de tamanho]"
     
@@ -177,97 +687,783 @@ class DocGenerator:
         
         return base_prompt
     
-    def generate(self, file_path: str) -> str:
+    def _create_multi_file_prompt(self, sources: List[Tuple[str, str, str]]) -> str:
         """
-        Gera documentação para um único arquivo de código.
+        Cria um prompt que pede a documentação de vários arquivos de uma vez.
+        
+        Args:
+            sources: Lista de tuplas (nome do arquivo, linguagem, código).
+            
+        Returns:
+            Prompt formatado para o LLM, pedindo a resposta em JSON.
+        """
+        files_section = "\n".join(
+            f"""
+        ### Arquivo: {file_name}
+        - Linguagem: {language}
+        ```{language.lower()}
+        {code}
+        ```
+        """
+            for file_name, language, code in sources
+        )
+        
+        base_prompt = f"""
+        # Tarefa: Gerar documentação técnica para cada um dos arquivos abaixo
+        
+        ## Arquivos a serem documentados:
+        {files_section}
+        
+        ## Instruções para Geração de Documentação
+        
+        Para cada arquivo, de forma independente:
+        1. Comece com uma visão geral explicando o propósito principal do código.
+        2. Identifique e descreva as principais classes, funções, métodos e suas responsabilidades.
+        3. Documente os parâmetros, tipos de retorno e exceções lançadas.
+        4. Inclua exemplos de uso, quando aplicável.
+        5. Destaque quaisquer possíveis problemas, limitações ou considerações de performance.
+        
+        ## Formato da Resposta
+        Responda apenas com um objeto JSON no formato {{"docs": {{"<nome do arquivo>": "<documentação>"}}}},
+        com uma entrada para cada arquivo, usando exatamente os nomes listados acima.
+        Cada documentação deve estar em Markdown estruturado.
+        """
+        
+        return base_prompt
+    
+    def _load_source(self, file_path: str) -> Tuple[str, str]:
+        """
+        Lê o arquivo e identifica sua linguagem.
         
         Args:
             file_path: Caminho para o arquivo de código.
             
         Returns:
-            Documentação gerada.
+            Tupla (código com espaços normalizados, linguagem).
+        """
+        # Lê o arquivo
+        with open(file_path, 'r', encoding='utf-8') as f:
+            code = f.read()
+        
+        language = self._get_language_from_extension(file_path)
+        
+        if language == "Desconhecido":
+            logger.warning(f"Linguagem desconhecida para o arquivo {file_path}. A documentação pode não ser ideal.")
+        
+        return _normalize_whitespace(code), language
+    
+    def _read_source(self, file_path: str) -> Tuple[str, str]:
+        """
+        Lê o arquivo e prepara o código para o prompt.
+        
+        Args:
+            file_path: Caminho para o arquivo de código.
+            
+        Returns:
+            Tupla (código truncado se necessário, linguagem).
+        """
+        code, language = self._load_source(file_path)
+        return self._prepare_source(file_path, code, language), language
+    
+    def _prepare_source(self, file_path: str, code: str, language: str) -> str:
+        """
+        Compacta e, se ainda necessário, trunca o código.
+        
+        Se a compactação falhar, o código é apenas truncado.
+        
+        Args:
+            file_path: Caminho do arquivo, usado nas mensagens de log.
+            code: Código fonte.
+            language: Linguagem de programação do código.
+            
+        Returns:
+            Código pronto para o prompt.
         """
         try:
-            # Lê o arquivo
-            with open(file_path, 'r', encoding='utf-8') as f:
-                code = f.read()
+            code = self._compact_code(code, language)
+        except Exception as e:
+            logger.warning(f"Falha ao compactar {file_path} ({str(e)}). Usando apenas truncamento.")
+        return self._truncate_code(code)
+    
+    def _read_sources(self, file_paths: List[str]) -> List[Tuple[str, str, str]]:
+        """
+        Lê e prepara vários arquivos, tokenizando-os em lote.
+        
+        Equivale a chamar _read_source para cada arquivo, mas os arquivos que
+        precisam de contagem de tokens são tokenizados com uma única chamada a
+        encode_ordinary_batch. Arquivos que não puderem ser lidos ou
+        preparados são registrados no log e ignorados.
+        
+        Args:
+            file_paths: Caminhos dos arquivos de código.
             
-            # Obtém informações do arquivo
-            file_name = os.path.basename(file_path)
-            language = self._get_language_from_extension(file_path)
+        Returns:
+            Lista de tuplas (caminho do arquivo, código preparado, linguagem).
+        """
+        loaded = []
+        for file_path in file_paths:
+            try:
+                loaded.append((file_path, *self._load_source(file_path)))
+            except Exception as e:
+                logger.error(f"Falha ao ler {file_path}: {str(e)}")
+        
+        # Só tokeniza os arquivos que _compact_code não consegue decidir pelo
+        # tamanho em bytes; as contagens ficam no cache para reaproveitamento
+        _prime_token_cache(
+            self.tokenizer,
+            [code for _, code, _ in loaded if not _fits_by_bytes(code, MAX_TOKENS-1000)]
+        )
+        
+        prepared = []
+        for file_path, code, language in loaded:
+            try:
+                prepared.append((file_path, self._prepare_source(file_path, code, language), language))
+            except Exception as e:
+                logger.error(f"Falha ao preparar {file_path}: {str(e)}")
+        
+        if self.files_per_request > 1:
+            # Com agrupamento, _iter_file_groups conta os tokens de todos os arquivos
+            _prime_token_cache(self.tokenizer, [code for _, code, _ in prepared])
+        return prepared
+    
+    def _build_messages(self, file_path: str, source: Optional[Tuple[str, str]] = None) -> List[Dict[str, str]]:
+        """
+        Lê o arquivo e monta as mensagens enviadas ao LLM.
+        
+        Args:
+            file_path: Caminho para o arquivo de código.
+            source: Tupla (código, linguagem) já lida por _read_source, se houver.
             
-            if language == "Desconhecido":
-                logger.warning(f"Linguagem desconhecida para o arquivo {file_path}. A documentação pode não ser ideal.")
+        Returns:
+            Lista de mensagens no formato da API de chat.
+        """
+        code, language = source or self._read_source(file_path)
+        file_name = os.path.basename(file_path)
+        
+        # Cria o prompt
+        prompt = self._create_prompt(code, language, file_name)
+        
+        logger.info(f"Gerando documentação para {file_path} ({language})")
+        
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _cache_key(self, messages: List[Dict[str, str]], variant: str = "") -> str:
+        """
+        Calcula a chave de cache para uma requisição.
+        
+        Args:
+            messages: Mensagens enviadas ao LLM.
+            variant: Identifica respostas geradas por outro prompt a partir das
+                mesmas mensagens (ex.: documentação agrupada).
             
-            # Trunca o código se necessário
-            code = self._truncate_code(code)
+        Returns:
+            Hash SHA-256 que identifica a requisição.
+        """
+        payload = json.dumps(messages, ensure_ascii=False, sort_keys=True)
+        content_hash = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        key = f"{self.model}|{self.temperature}|{PROMPT_TEMPLATE_VERSION}|{variant}|{content_hash}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+    
+    def _cache_get(self, key: str) -> Optional[str]:
+        """
+        Busca uma resposta do LLM no cache em disco.
+        
+        Args:
+            key: Chave de cache.
             
-            # Cria o prompt
-            prompt = self._create_prompt(code, language, file_name)
+        Returns:
+            Resposta armazenada ou None se não houver.
+        """
+        if not self.use_cache:
+            return None
+        
+        try:
+            return (self._cache_dir / f"{key}.md").read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Falha ao ler o cache: {str(e)}")
+            return None
+    
+    def _cache_put(self, key: str, content: str) -> None:
+        """
+        Armazena uma resposta do LLM no cache em disco.
+        
+        A escrita é atômica (arquivo temporário + os.replace), de modo que
+        execuções concorrentes nunca leem um arquivo pela metade.
+        
+        Args:
+            key: Chave de cache.
+            content: Resposta do LLM.
+        """
+        if not self.use_cache:
+            return
+        
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self._cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(tmp_path, self._cache_dir / f"{key}.md")
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Falha ao escrever no cache: {str(e)}")
+    
+    def _finalize(self, content: str) -> str:
+        """
+        Limpa a resposta do LLM e converte para o formato de saída.
+        
+        Args:
+            content: Conteúdo retornado pelo LLM.
             
-            logger.info(f"Gerando documentação para {file_path} ({language})")
+        Returns:
+            Documentação final.
+        """
+        documentation = content.strip()
+        
+        # Converte para o formato desejado, se necessário
+        if self.output_format != "markdown":
+            documentation = self._convert_format(documentation)
             
-            # Chama a API do LLM
-            response = openai.ChatCompletion.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "Você é um assistente especializado em gerar documentação técnica de alta qualidade para código-fonte."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=MAX_TOKENS
+        return documentation
+    
+    def _get_client(self) -> "openai.OpenAI":
+        """
+        Retorna o cliente síncrono da API, criando-o na primeira chamada.
+        
+        Returns:
+            Cliente da API OpenAI.
+        """
+        if self._client is None:
+            # As novas tentativas ficam a cargo do tenacity
+            self._client = openai.OpenAI(
+                api_key=openai.api_key,
+                max_retries=0,
+                http_client=httpx.Client(**self._http_client_options())
             )
+        return self._client
+    
+    def _create_async_client(self) -> "openai.AsyncOpenAI":
+        """
+        Cria o cliente assíncrono da API, compartilhado por todas as tarefas de
+        uma execução de generate_project.
+        
+        Um único pool de conexões (HTTP/2 quando disponível, com keep-alive)
+        evita um novo handshake TLS a cada requisição.
+        
+        Returns:
+            Cliente assíncrono da API OpenAI.
+        """
+        return openai.AsyncOpenAI(
+            api_key=openai.api_key,
+            max_retries=0,
+            http_client=httpx.AsyncClient(**self._http_client_options())
+        )
+    
+    def _http_client_options(self) -> Dict[str, object]:
+        """
+        Retorna as opções dos clientes httpx usados pela API.
+        
+        Returns:
+            Argumentos para httpx.Client ou httpx.AsyncClient.
+        """
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "limits": httpx.Limits(
+                max_connections=max(HTTP_MAX_CONNECTIONS, self.max_concurrency),
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS
+            ),
+            "timeout": httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+        }
+    
+    def close(self) -> None:
+        """
+        Fecha o cliente síncrono da API e suas conexões, se tiver sido criado.
+        """
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+    
+    @_llm_retry
+    def _call_llm(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Chama a API do LLM em modo streaming, com novas tentativas em erros transitórios.
+        
+        Args:
+            messages: Mensagens enviadas ao LLM.
+            
+        Returns:
+            Conteúdo completo da resposta.
+        """
+        stream = self._get_client().chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature,
+            max_tokens=MAX_TOKENS,
+            stream=True
+        )
+        
+        parts = []
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+        
+        return "".join(parts)
+    
+    @_llm_retry
+    async def _acall_llm(self, messages: List[Dict[str, str]], response_format: Optional[Dict[str, str]] = None) -> str:
+        """
+        Versão assíncrona de _call_llm.
+        
+        Args:
+            messages: Mensagens enviadas ao LLM.
+            response_format: Formato de resposta estruturada (ex.: {"type": "json_object"}).
             
-            # Extrai e retorna a documentação
-            documentation = response.choices[0].message.content.strip()
+        Returns:
+            Conteúdo completo da resposta.
+        """
+        if self._rate_limiter is not None:
+            # Estimativa conservadora: prompt + o máximo de tokens da resposta. Os
+            # prompts não vão para o cache, pois raramente se repetem
+            est_tokens = sum(len(self.tokenizer.encode_ordinary(m["content"])) for m in messages) + MAX_TOKENS
+            await self._rate_limiter.acquire(est_tokens)
+        
+        extra = {"response_format": response_format} if response_format else {}
+        stream = await self._aclient.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature,
+            max_tokens=MAX_TOKENS,
+            stream=True,
+            **extra
+        )
+        
+        parts = []
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+        
+        return "".join(parts)
+    
+    def generate(self, file_path: str) -> str:
+        """
+        Gera documentação para um único arquivo de código.
+        
+        Args:
+            file_path: Caminho para o arquivo de código.
             
-            # Converte para o formato desejado, se necessário
-            if self.output_format != "markdown":
-                documentation = self._convert_format(documentation)
-                
-            return documentation
+        Returns:
+            Documentação gerada.
+        """
+        try:
+            messages = self._build_messages(file_path)
+            
+            key = self._cache_key(messages)
+            content = self._cache_get(key)
+            if content is not None:
+                logger.info(f"Documentação reutilizada do cache para {file_path}")
+                return self._finalize(content)
+            
+            # Chama a API do LLM
+            content = self._call_llm(messages)
+            self._cache_put(key, content)
+            return self._finalize(content)
             
         except Exception as e:
             logger.error(f"Erro ao gerar documentação para {file_path}: {str(e)}")
             raise
     
-    def generate_project(self, project_dir: str, exclude_dirs: List[str] = None) -> Dict[str, str]:
+    async def _agenerate(self, file_path: str, source: Optional[Tuple[str, str]] = None) -> str:
         """
-        Gera documentação para um projeto inteiro.
+        Versão assíncrona de generate, usada por generate_project.
         
         Args:
-            project_dir: Diretório do projeto.
-            exclude_dirs: Lista de diretórios a serem excluídos.
+            file_path: Caminho para o arquivo de código.
+            source: Tupla (código, linguagem) já lida por _read_source, se houver.
+            
+        Returns:
+            Documentação gerada.
+        """
+        try:
+            messages = self._build_messages(file_path, source)
+            
+            key = self._cache_key(messages)
+            content = self._cache_get(key)
+            if content is not None:
+                logger.info(f"Documentação reutilizada do cache para {file_path}")
+                return self._finalize(content)
+            
+            # Chama a API do LLM sem bloquear o event loop
+            content = await self._acall_llm(messages)
+            self._cache_put(key, content)
+            return self._finalize(content)
+            
+        except Exception as e:
+            logger.error(f"Erro ao gerar documentação para {file_path}: {str(e)}")
+            raise
+    
+    async def _agenerate_group(self, group: List[Tuple[str, str, str]], project_dir: str) -> Dict[str, str]:
+        """
+        Gera a documentação de um grupo de arquivos pequenos em uma única requisição.
+        
+        Arquivos presentes no cache não são enviados. Se a requisição agrupada
+        falhar, ou algum arquivo não vier na resposta JSON, os arquivos
+        restantes são documentados individualmente.
+        
+        Args:
+            group: Lista de tuplas (caminho do arquivo, código, linguagem).
+            project_dir: Diretório do projeto, usado para nomear os arquivos no prompt.
             
         Returns:
             Dicionário com caminhos de arquivo e suas documentações.
         """
+        docs = {}
+        pending = []
+        
+        for file_path, code, language in group:
+            messages = self._build_messages(file_path, (code, language))
+            # Uma documentação individual em cache também serve; a agrupada tem chave própria,
+            # pois vem de outro prompt e não deve ser devolvida por generate
+            key = self._cache_key(messages, variant=PACKED_CACHE_VARIANT)
+            content = self._cache_get(self._cache_key(messages))
+            if content is None:
+                content = self._cache_get(key)
+            if content is not None:
+                logger.info(f"Documentação reutilizada do cache para {file_path}")
+                docs[file_path] = self._finalize(content)
+            else:
+                pending.append((file_path, code, language, key))
+        
+        if len(pending) > 1:
+            names = {os.path.relpath(file_path, project_dir): file_path for file_path, _, _, _ in pending}
+            prompt = self._create_multi_file_prompt([
+                (name, language, code)
+                for name, (_, code, language, _) in zip(names, pending)
+            ])
+            try:
+                content = await self._acall_llm(
+                    [
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    response_format={"type": "json_object"}
+                )
+                generated = json.loads(content)["docs"]
+                if not isinstance(generated, dict):
+                    raise TypeError("'docs' não é um objeto")
+            except Exception as e:
+                # Inclui erros da API (ex.: modelo sem suporte a JSON mode) e respostas cortadas
+                logger.warning(f"Falha na requisição agrupada ({str(e)}). Documentando os arquivos individualmente.")
+                generated = {}
+            
+            remaining = []
+            for name, (file_path, code, language, key) in zip(names, pending):
+                doc = generated.get(name)
+                if isinstance(doc, str) and doc.strip():
+                    self._cache_put(key, doc)
+                    docs[file_path] = self._finalize(doc)
+                else:
+                    remaining.append((file_path, code, language, key))
+            pending = remaining
+        
+        # Arquivos isolados ou ausentes da resposta agrupada
+        for file_path, code, language, _ in pending:
+            try:
+                docs[file_path] = await self._agenerate(file_path, (code, language))
+            except Exception as e:
+                logger.error(f"Falha ao gerar documentação para {file_path}: {str(e)}")
+        
+        return docs
+    
+    def _iter_file_groups(self, file_paths: Iterator[str]) -> Iterator[List[Tuple[str, str, str]]]:
+        """
+        Agrupa arquivos pequenos para que sejam documentados em uma mesma requisição.
+        
+        Um grupo reúne até files_per_request arquivos cuja soma de tokens cabe
+        em PACK_TOKEN_BUDGET e cujas documentações estimadas cabem juntas em
+        MAX_TOKENS; arquivos maiores formam grupos de um único arquivo.
+        
+        Args:
+            file_paths: Caminhos dos arquivos de código.
+            
+        Yields:
+            Listas de tuplas (caminho do arquivo, código, linguagem).
+        """
+        group = []
+        group_tokens = 0
+        group_output = 0
+        file_paths = iter(file_paths)
+        
+        # Lê e tokeniza os arquivos em lotes, sem perder a descoberta sob demanda
+        sources = (
+            source
+            for chunk in iter(lambda: list(islice(file_paths, TOKENIZE_BATCH_SIZE)), [])
+            for source in self._read_sources(chunk)
+        )
+        
+        for file_path, code, language in sources:
+            if self.files_per_request == 1:
+                yield [(file_path, code, language)]
+                continue
+            
+            tokens = self._count_tokens(code)
+            output = PACKED_DOC_BASE_TOKENS + tokens
+            if tokens > PACK_TOKEN_BUDGET or output > MAX_TOKENS // 2:
+                yield [(file_path, code, language)]
+                continue
+            
+            if group and (
+                group_tokens + tokens > PACK_TOKEN_BUDGET
+                or group_output + output > MAX_TOKENS
+                or len(group) >= self.files_per_request
+            ):
+                yield group
+                group = []
+                group_tokens = 0
+                group_output = 0
+            
+            group.append((file_path, code, language))
+            group_tokens += tokens
+            group_output += output
+        
+        if group:
+            yield group
+    
+    def _iter_source_files(self, project_dir: str, exclude_dirs: List[str] = None) -> Iterator[str]:
+        """
+        Percorre o projeto e produz, sob demanda, os arquivos de código suportados.
+        
+        Args:
+            project_dir: Diretório do projeto.
+            exclude_dirs: Lista de diretórios a serem excluídos.
+            
+        Yields:
+            Caminhos dos arquivos encontrados.
+        """
         if exclude_dirs is None:
-            exclude_dirs = ['.git', 'node_modules', 'venv', '__pycache__', 'dist', 'build']
+            exclude_dirs = DEFAULT_EXCLUDE_DIRS
+        
+        try:
+            entries = os.scandir(project_dir)
+        except OSError as e:
+            logger.error(f"Não foi possível listar {project_dir}: {str(e)}")
+            return
+        
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    # Filtra diretórios a serem excluídos
+                    if entry.name not in exclude_dirs:
+                        yield from self._iter_source_files(entry.path, exclude_dirs)
+                elif os.path.splitext(entry.name)[1].lower() in SUPPORTED_LANGUAGES and entry.is_file():
+                    yield entry.path
+    
+    def generate_project(
+        self,
+        project_dir: str,
+        exclude_dirs: List[str] = None,
+        output_dir: Optional[str] = None
+    ) -> Union[Dict[str, str], List[Tuple[str, str]]]:
+        """
+        Gera documentação para um projeto inteiro.
+        
+        Os arquivos são descobertos sob demanda e distribuídos entre
+        max_concurrency tarefas, que fazem as requisições ao LLM em paralelo.
+        Arquivos pequenos são agrupados (até files_per_request por requisição)
+        e documentados com uma única resposta JSON.
+        
+        Com output_dir, cada documentação é salva assim que gerada e apenas os
+        caminhos ficam em memória; o índice é criado ao final. Sem output_dir,
+        mantém o comportamento antigo de retornar todas as documentações em
+        memória para uso com save_project.
+        
+        Args:
+            project_dir: Diretório do projeto.
+            exclude_dirs: Lista de diretórios a serem excluídos.
+            output_dir: Diretório para salvar a documentação durante a geração.
             
+        Returns:
+            Lista de tuplas (caminho do arquivo, caminho da documentação salva)
+            se output_dir for informado; caso contrário, dicionário com caminhos
+            de arquivo e suas documentações.
+        """
+        groups = self._iter_file_groups(self._iter_source_files(project_dir, exclude_dirs))
         project_docs = {}
+        saved_docs = []
         
-        for root, dirs, files in os.walk(project_dir):
-            # Filtra diretórios a serem excluídos
-            dirs[:] = [d for d in dirs if d not in exclude_dirs]
-            
-            for file in files:
-                file_path = os.path.join(root, file)
-                extension = os.path.splitext(file)[1].lower()
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
+        
+        groups_lock = asyncio.Lock()
+        
+        async def next_group() -> Optional[List[Tuple[str, str, str]]]:
+            # Ler, tokenizar e compactar os arquivos bloquearia o event loop; o
+            # gerador avança em uma thread, uma tarefa por vez
+            async with groups_lock:
+                return await asyncio.to_thread(next, groups, None)
+        
+        async def worker() -> None:
+            # Todas as tarefas consomem o mesmo gerador de grupos de arquivos
+            while (group := await next_group()) is not None:
+                try:
+                    if len(group) == 1:
+                        file_path, code, language = group[0]
+                        docs = {file_path: await self._agenerate(file_path, (code, language))}
+                    else:
+                        docs = await self._agenerate_group(group, project_dir)
+                except Exception as e:
+                    for file_path, _, _ in group:
+                        logger.error(f"Falha ao gerar documentação para {file_path}: {str(e)}")
+                    continue
                 
-                if extension in SUPPORTED_LANGUAGES:
-                    try:
-                        # Gera documentação para este arquivo
-                        doc = self.generate(file_path)
-                        
+                for file_path, doc in docs.items():
+                    rel_path = os.path.relpath(file_path, project_dir)
+                    logger.info(f"Documentação gerada com sucesso para {rel_path}")
+                    
+                    if output_dir is None:
                         # Armazena a documentação
-                        rel_path = os.path.relpath(file_path, project_dir)
                         project_docs[rel_path] = doc
-                        
-                        logger.info(f"Documentação gerada com sucesso para {rel_path}")
-                        
-                    except Exception as e:
-                        logger.error(f"Falha ao gerar documentação para {file_path}: {str(e)}")
+                        continue
+                    
+                    # Salva imediatamente, sem bloquear as demais tarefas
+                    try:
+                        output_path = await asyncio.to_thread(self._write_project_doc, rel_path, doc, output_dir)
+                    except OSError as e:
+                        logger.error(f"Falha ao salvar documentação de {rel_path}: {str(e)}")
+                        continue
+                    saved_docs.append((rel_path, output_path))
+        
+        async def _run() -> None:
+            # O cliente vive no event loop desta execução, pois as conexões do
+            # httpx.AsyncClient não podem ser reaproveitadas entre loops
+            self._aclient = self._create_async_client()
+            # Um único limitador é compartilhado por todas as tarefas
+            if self.requests_per_minute or self.tokens_per_minute:
+                self._rate_limiter = TokenBucket(self.requests_per_minute, self.tokens_per_minute)
+            try:
+                await asyncio.gather(*(worker() for _ in range(self.max_concurrency)))
+            finally:
+                await self._aclient.close()
+                self._aclient = None
+                self._rate_limiter = None
+        
+        asyncio.run(_run())
+        
+        if output_dir is None:
+            return project_docs
+        
+        saved_docs.sort()
+        self._create_index((rel_path for rel_path, _ in saved_docs), output_dir)
+        return saved_docs
+    
+    def generate_project_batch(
+        self,
+        project_dir: str,
+        exclude_dirs: List[str] = None,
+        poll_interval: float = BATCH_POLL_INTERVAL
+    ) -> Dict[str, str]:
+        """
+        Gera documentação para um projeto inteiro usando a Batch API da OpenAI.
+        
+        Todas as requisições são enviadas em um único arquivo JSONL e processadas
+        de forma assíncrona pela API (em até 24h), com custo reduzido e sem
+        disputar os limites de requisições por minuto.
+        
+        Args:
+            project_dir: Diretório do projeto.
+            exclude_dirs: Lista de diretórios a serem excluídos.
+            poll_interval: Intervalo, em segundos, entre consultas ao status do lote.
+            
+        Returns:
+            Dicionário com caminhos de arquivo e suas documentações.
+        """
+        project_docs = {}
+        pending = {}
+        lines = []
+        
+        for file_path in self._iter_source_files(project_dir, exclude_dirs):
+            rel_path = os.path.relpath(file_path, project_dir)
+            try:
+                messages = self._build_messages(file_path)
+            except Exception as e:
+                logger.error(f"Falha ao preparar {file_path}: {str(e)}")
+                continue
+            
+            key = self._cache_key(messages)
+            content = self._cache_get(key)
+            if content is not None:
+                logger.info(f"Documentação reutilizada do cache para {file_path}")
+                project_docs[rel_path] = self._finalize(content)
+                continue
+            
+            pending[rel_path] = key
+            lines.append(json.dumps({
+                "custom_id": rel_path,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "messages": messages,
+                    "temperature": self.temperature,
+                    "max_tokens": MAX_TOKENS
+                }
+            }, ensure_ascii=False))
+        
+        if not lines:
+            return project_docs
+        
+        client = self._get_client()
+        
+        # Envia o arquivo JSONL e cria o lote
+        batch_input = client.files.create(
+            file=("codedocgen_batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = client.batches.create(
+            input_file_id=batch_input.id,
+            endpoint="/v1/chat/completions",
+            completion_window=BATCH_COMPLETION_WINDOW
+        )
+        logger.info(f"Lote {batch.id} criado com {len(lines)} requisições")
+        
+        # Aguarda a conclusão do lote
+        while batch.status not in BATCH_FINAL_STATUSES:
+            time.sleep(poll_interval)
+            batch = client.batches.retrieve(batch.id)
+            logger.info(f"Lote {batch.id}: {batch.status}")
+        
+        if batch.status != "completed" and not batch.output_file_id:
+            raise RuntimeError(f"Lote {batch.id} terminou com status '{batch.status}'")
+        
+        # Processa os resultados pelo custom_id
+        output = client.files.content(batch.output_file_id).text if batch.output_file_id else ""
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            
+            result = json.loads(line)
+            rel_path = result["custom_id"]
+            response = result.get("response") or {}
+            
+            if result.get("error") or response.get("status_code") != 200:
+                logger.error(f"Falha ao gerar documentação para {rel_path}: {result.get('error') or response.get('body')}")
+                continue
+            
+            content = response["body"]["choices"][0]["message"]["content"]
+            self._cache_put(pending[rel_path], content)
+            project_docs[rel_path] = self._finalize(content)
+            
+            logger.info(f"Documentação gerada com sucesso para {rel_path}")
+        
+        missing = set(pending) - set(project_docs)
+        if missing:
+            logger.error(f"Lote {batch.id} sem resultado para {len(missing)} arquivo(s): {', '.join(sorted(missing))}")
         
         return project_docs
     
@@ -284,21 +1480,15 @@ class DocGenerator:
         if self.output_format == "html":
             # Implementar conversão para HTML
             # Esta é uma implementação simplificada
-            try:
-                import markdown
-                return markdown.markdown(markdown_doc)
-            except ImportError:
-                logger.warning("Biblioteca 'markdown' não encontrada. Instalando: pip install markdown")
-                raise
+            return _markdown_to_html(markdown_doc)
         
         elif self.output_format == "pdf":
             # Implementar conversão para PDF
             # Esta é uma implementação simplificada
             try:
-                import markdown
-                from weasyprint import HTML
+                _require_weasyprint()
                 
-                html = markdown.markdown(markdown_doc)
+                html = _markdown_to_html(markdown_doc)
                 # Aqui você normalmente retornaria bytes do PDF, mas para simplicidade retornamos o HTML
                 logger.warning("Conversão real para PDF requer implementação completa")
                 return html
@@ -334,6 +1524,51 @@ class DocGenerator:
             
         logger.info(f"Documentação salva em: {output_path}")
     
+    def _project_output_path(self, rel_path: str, output_dir: str) -> str:
+        """
+        Calcula o caminho de saída da documentação de um arquivo do projeto.
+        
+        Args:
+            rel_path: Caminho do arquivo de código relativo ao projeto.
+            output_dir: Diretório para salvar a documentação.
+            
+        Returns:
+            Caminho do arquivo de documentação.
+        """
+        # Cria o caminho de saída correspondente
+        output_path = os.path.join(output_dir, rel_path)
+        
+        # Adiciona a extensão correta
+        if self.output_format == "html":
+            return output_path.rsplit(".", 1)[0] + ".html"
+        elif self.output_format == "pdf":
+            return output_path.rsplit(".", 1)[0] + ".pdf"
+        else:  # markdown
+            return output_path.rsplit(".", 1)[0] + ".md"
+    
+    def _write_project_doc(self, rel_path: str, doc: str, output_dir: str) -> str:
+        """
+        Salva a documentação de um arquivo do projeto.
+        
+        Args:
+            rel_path: Caminho do arquivo de código relativo ao projeto.
+            doc: Documentação gerada.
+            output_dir: Diretório para salvar a documentação.
+            
+        Returns:
+            Caminho do arquivo salvo.
+        """
+        output_path = self._project_output_path(rel_path, output_dir)
+        
+        # Cria o diretório para este arquivo, se necessário
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        
+        # Salva a documentação
+        Path(output_path).write_text(doc, encoding='utf-8')
+            
+        logger.info(f"Documentação salva em: {output_path}")
+        return output_path
+    
     def save_project(self, project_docs: Dict[str, str], output_dir: str) -> None:
         """
         Salva a documentação de um projeto inteiro.
@@ -344,37 +1579,27 @@ class DocGenerator:
         """
         os.makedirs(output_dir, exist_ok=True)
         
-        # Processa cada arquivo e sua documentação
-        for rel_path, doc in project_docs.items():
-            # Cria o caminho de saída correspondente
-            output_path = os.path.join(output_dir, rel_path)
-            
-            # Adiciona a extensão correta
-            if self.output_format == "html":
-                output_path = output_path.rsplit(".", 1)[0] + ".html"
-            elif self.output_format == "pdf":
-                output_path = output_path.rsplit(".", 1)[0] + ".pdf"
-            else:  # markdown
-                output_path = output_path.rsplit(".", 1)[0] + ".md"
-            
-            # Cria o diretório para este arquivo, se necessário
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            # Salva a documentação
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(doc)
-                
-            logger.info(f"Documentação salva em: {output_path}")
+        # As escritas são feitas em threads para que se sobreponham; sem
+        # asyncio.run, o método continua utilizável dentro de um event loop
+        if project_docs:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                list(executor.map(
+                    self._write_project_doc,
+                    project_docs.keys(),
+                    project_docs.values(),
+                    [output_dir] * len(project_docs)
+                ))
         
         # Cria um índice
-        self._create_index(project_docs, output_dir)
+        self._create_index(project_docs.keys(), output_dir)
         
-    def _create_index(self, project_docs: Dict[str, str], output_dir: str) -> None:
+    def _create_index(self, rel_paths: Iterable[str], output_dir: str) -> None:
         """
         Cria um arquivo de índice para a documentação do projeto.
         
         Args:
-            project_docs: Dicionário com caminhos de arquivo e suas documentações.
+            rel_paths: Caminhos dos arquivos documentados, relativos ao projeto
+                (um dicionário project_docs também é aceito).
             output_dir: Diretório onde a documentação está salva.
         """
         # Define o nome do arquivo de índice baseado no formato
@@ -389,28 +1614,25 @@ class DocGenerator:
             index_file = os.path.join(output_dir, "index.md")
             header = "# Índice da Documentação\n\n"
             footer = ""
-            item_template = "- [{}]({})\n"
+            item_template = "- [{1}]({0})\n"
             list_start = ""
             list_end = ""
         
-        # Cria o conteúdo do índice
-        content = header + list_start
+        # Cria o conteúdo do índice (as partes são unidas uma única vez no final)
+        parts = [header, list_start]
         
         # Agrupa os arquivos por diretório para uma melhor organização
-        grouped_files = {}
-        for rel_path in project_docs.keys():
-            dir_name = os.path.dirname(rel_path)
-            if dir_name not in grouped_files:
-                grouped_files[dir_name] = []
-            grouped_files[dir_name].append(rel_path)
+        grouped_files = defaultdict(list)
+        for rel_path in rel_paths:
+            grouped_files[os.path.dirname(rel_path)].append(rel_path)
         
         # Adiciona cada grupo ao índice
         for dir_name, files in sorted(grouped_files.items()):
             if dir_name:
                 if self.output_format == "html":
-                    content += f'<h2>{dir_name}</h2>\n<ul>\n'
+                    parts.append(f'<h2>{dir_name}</h2>\n<ul>\n')
                 else:
-                    content += f"\n## {dir_name}\n\n"
+                    parts.append(f"\n## {dir_name}\n\n")
             
             for file_path in sorted(files):
                 # Determina o caminho para o link
@@ -422,16 +1644,16 @@ class DocGenerator:
                     link_path = file_path.rsplit(".", 1)[0] + ".md"
                 
                 # Adiciona o item ao índice
-                content += item_template.format(link_path, os.path.basename(file_path))
+                parts.append(item_template.format(link_path, os.path.basename(file_path)))
             
             if dir_name and self.output_format == "html":
-                content += '</ul>\n'
+                parts.append('</ul>\n')
         
-        content += list_end + footer
+        parts.append(list_end + footer)
         
         # Salva o arquivo de índice
         with open(index_file, 'w', encoding='utf-8') as f:
-            f.write(content)
+            f.write("".join(parts))
             
         logger.info(f"Índice de documentação criado em: {index_file}")
 
@@ -452,6 +1674,16 @@ def main():
                         help=f"Formato de saída (padrão: markdown)")
     parser.add_argument("-e", "--exclude", nargs="+", default=None,
                         help="Diretórios a serem excluídos (para projetos)")
+    parser.add_argument("--files-per-request", type=int, default=DEFAULT_FILES_PER_REQUEST,
+                        help=f"Máximo de arquivos pequenos por requisição em projetos (requer modelo com JSON mode; padrão: {DEFAULT_FILES_PER_REQUEST}, sem agrupamento)")
+    parser.add_argument("--rpm", type=int, default=None,
+                        help="Limite de requisições por minuto da conta, aplicado em projetos")
+    parser.add_argument("--tpm", type=int, default=None,
+                        help="Limite de tokens por minuto da conta, aplicado em projetos")
+    parser.add_argument("--batch", action="store_true",
+                        help="Usa a Batch API da OpenAI para projetos (custo menor, conclusão em até 24h)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignora o cache de documentações e sempre chama o LLM")
     
     args = parser.parse_args()
     
@@ -459,7 +1691,11 @@ def main():
     doc_gen = DocGenerator(
         model=args.model,
         temperature=args.temperature,
-        output_format=args.format
+        output_format=args.format,
+        files_per_request=args.files_per_request,
+        use_cache=not args.no_cache,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm
     )
     
     # Verifica se é um arquivo ou diretório
@@ -476,15 +1712,19 @@ def main():
         doc_gen.save(documentation, args.output)
         
     elif os.path.isdir(args.input):
-        # Gera documentação para um projeto
-        project_docs = doc_gen.generate_project(args.input, args.exclude)
-        
         # Define o diretório de saída se não fornecido
         if not args.output:
             args.output = os.path.join(os.path.dirname(args.input), "documentacao")
         
-        # Salva a documentação do projeto
-        doc_gen.save_project(project_docs, args.output)
+        # Gera documentação para um projeto
+        if args.batch:
+            project_docs = doc_gen.generate_project_batch(args.input, args.exclude)
+            
+            # Salva a documentação do projeto
+            doc_gen.save_project(project_docs, args.output)
+        else:
+            # Cada documentação é salva assim que gerada
+            doc_gen.generate_project(args.input, args.exclude, output_dir=args.output)
         
     else:
         logger.error(f"Entrada inválida: {args.input}")
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Configuração compartilhada dos testes do CodeDocGen.
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "codedocgen"))
+
+import main  # noqa: E402
+
+
+class CharEncoding:
+    """
+    Codificador determinístico (um token por caractere), para não depender
+    do download dos arquivos BPE do tiktoken.
+    """
+    
+    name = "test-chars"
+    
+    def encode(self, text, **kwargs):
+        return [ord(c) for c in text]
+    
+    def encode_ordinary(self, text):
+        return [ord(c) for c in text]
+    
+    def encode_ordinary_batch(self, texts, num_threads=8):
+        return [self.encode_ordinary(t) for t in texts]
+    
+    def decode(self, tokens):
+        return "".join(map(chr, tokens))
+
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class _AsyncStream:
+    def __init__(self, text):
+        self._parts = iter([text])
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self):
+        try:
+            return _chunk(next(self._parts))
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeAsyncClient:
+    """
+    Cliente assíncrono falso: responde com o texto devolvido por `respond`,
+    que recebe os argumentos de chat.completions.create.
+    """
+    
+    def __init__(self, respond):
+        self.calls = []
+        self._respond = respond
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+    
+    async def _create(self, **kwargs):
+        self.calls.append(kwargs)
+        return _AsyncStream(self._respond(kwargs))
+    
+    async def close(self):
+        pass
+
+
+class FakeSyncClient:
+    """
+    Cliente síncrono falso: responde com o texto devolvido por `respond` e,
+    para a Batch API, devolve `batch_output` como conteúdo do arquivo de saída.
+    """
+    
+    def __init__(self, respond=None, batch_output=""):
+        self.calls = []
+        self.uploads = []
+        self._respond = respond
+        self._batch_output = batch_output
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.files = SimpleNamespace(create=self._upload, content=self._content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+    
+    def _create(self, **kwargs):
+        self.calls.append(kwargs)
+        return iter([_chunk(self._respond(kwargs))])
+    
+    def _upload(self, file, purpose):
+        self.uploads.append(file[1].decode("utf-8"))
+        return SimpleNamespace(id="file-input")
+    
+    def _create_batch(self, **kwargs):
+        return SimpleNamespace(id="batch-1", status="in_progress", output_file_id=None)
+    
+    def _retrieve_batch(self, batch_id):
+        return SimpleNamespace(id=batch_id, status="completed", output_file_id="file-output")
+    
+    def _content(self, file_id):
+        return SimpleNamespace(text=self._batch_output)
+    
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def doc_gen(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "_get_encoder", lambda model: CharEncoding())
+    return main.DocGenerator(api_key="test", cache_dir=str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def fake_llm(doc_gen, monkeypatch):
+    """
+    Instala um cliente falso em doc_gen; use fake_llm(respond) nos testes.
+    """
+    def install(respond):
+        client = FakeAsyncClient(respond)
+        monkeypatch.setattr(doc_gen, "_create_async_client", lambda: client)
+        return client
+    return install
+
+
+@pytest.fixture
+def fake_sync_llm(doc_gen, monkeypatch):
+    """
+    Instala um cliente síncrono falso em doc_gen; use fake_sync_llm(respond=..., batch_output=...).
+    """
+    def install(respond=None, batch_output=""):
+        client = FakeSyncClient(respond, batch_output)
+        monkeypatch.setattr(doc_gen, "_get_client", lambda: client)
+        return client
+    return install
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Testes do avaliador de documentação (codedocgen/evaluator.py).
+"""
+
+import numpy as np
+import pytest
+from nltk.translate.bleu_score import SmoothingFunction, sentence_bleu
+
+import evaluator
+
+
+@pytest.fixture
+def doc_eval():
+    return evaluator.DocEvaluator(api_key="test")
+
+
+def test_bleu_batch_matches_nltk_sentence_bleu(doc_eval):
+    hyps = [
+        "Returns the sum of a and b.",
+        "Opens the file and reads every line into a list.",
+        "Nothing in common here",
+        "",
+    ]
+    refs = [
+        "Return the sum of the two numbers a and b.",
+        "Reads every line of the file into a list.",
+        "Computes the average value.",
+        "Some reference.",
+    ]
+    
+    scores = doc_eval.evaluate_bleu_batch(hyps, refs)
+    
+    smoothing = SmoothingFunction().method1
+    expected = [
+        sentence_bleu(
+            [evaluator.BLEU_TOKEN_RE.findall(ref.lower())],
+            evaluator.BLEU_TOKEN_RE.findall(hyp.lower()),
+            smoothing_function=smoothing,
+        )
+        for hyp, ref in zip(hyps, refs)
+    ]
+    np.testing.assert_allclose(scores, expected, rtol=1e-9, atol=1e-12)
+
+
+def test_evaluate_completeness_uses_language_extractor(doc_eval):
+    code = "def load():\n    pass\n\nclass Parser:\n    def parse(self):\n        pass\n"
+    
+    score = doc_eval.evaluate_completeness(code, "Carrega os dados com `load`.", "Python")
+    
+    assert score == pytest.approx(1 / 3)
+
+
+def test_kotlin_extension_functions_record_function_name(doc_eval):
+    code = (
+        "fun <T> List<T>.second(): T = this[1]\n"
+        "fun String.shout(): String = uppercase()\n"
+        "fun <K, V> Map<K, V?>.compact(): Map<K, V> = TODO()\n"
+        "class Parser\n"
+    )
+    
+    elements = doc_eval._extract_code_elements(code, "Kotlin")
+    
+    assert elements == {"second", "shout", "compact", "Parser"}
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+Testes do gerador de documentação (codedocgen/main.py).
+"""
+
+import json
+import re
+
+import pytest
+
+import main
+
+
+def _write_project(root, files):
+    for rel_path, code in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(code, encoding="utf-8")
+    return root
+
+
+def test_grouped_request_failure_falls_back_to_individual_files(doc_gen, fake_llm, tmp_path):
+    project = _write_project(tmp_path / "proj", {f"m{i}.py": f"x{i} = {i}\n" for i in range(4)})
+    
+    def respond(kwargs):
+        if "response_format" in kwargs:
+            # Ex.: BadRequestError de um modelo sem suporte a JSON mode
+            raise RuntimeError("400: response_format não suportado")
+        return "doc individual"
+    
+    fake_llm(respond)
+    doc_gen.files_per_request = 4
+    
+    docs = doc_gen.generate_project(str(project))
+    
+    assert docs == {f"m{i}.py": "doc individual" for i in range(4)}
+
+
+def test_grouped_docs_are_not_served_to_single_file_generate(doc_gen, fake_llm, tmp_path):
+    project = _write_project(tmp_path / "proj", {"a.py": "a = 1\n", "b.py": "b = 2\n"})
+    
+    def respond(kwargs):
+        names = re.findall(r"### Arquivo: (\S+)", kwargs["messages"][-1]["content"])
+        return json.dumps({"docs": {name: f"agrupada {name}" for name in names}})
+    
+    client = fake_llm(respond)
+    doc_gen.files_per_request = 4
+    
+    assert doc_gen.generate_project(str(project)) == {"a.py": "agrupada a.py", "b.py": "agrupada b.py"}
+    assert len(client.calls) == 1
+    
+    messages = doc_gen._build_messages(str(project / "a.py"))
+    assert doc_gen._cache_get(doc_gen._cache_key(messages)) is None
+    assert doc_gen._cache_get(doc_gen._cache_key(messages, variant=main.PACKED_CACHE_VARIANT)) == "agrupada a.py"
+
+
+def test_file_groups_respect_expected_output_size(doc_gen, tmp_path):
+    # 150 tokens de código cada: os 10 arquivos cabem na entrada, mas não na resposta
+    project = _write_project(tmp_path / "proj", {f"m{i}.py": "x" * 149 + "\n" for i in range(10)})
+    doc_gen.files_per_request = 10
+    
+    groups = list(doc_gen._iter_file_groups(doc_gen._iter_source_files(str(project))))
+    
+    assert sorted(len(group) for group in groups) == [3, 7]
+
+
+def test_compact_code_handles_whitespace_only_docstrings(doc_gen):
+    code = 'class A:\n    """   """\n    def f(self):\n        """\n\n        """\n        return 1\n'
+    
+    compacted = doc_gen._compact_code(code, "Python", max_tokens=1)
+    
+    assert "class A:" in compacted
+    assert "def f(self):" in compacted
+    assert "return 1" not in compacted
+
+
+def test_compact_code_keeps_comment_markers_inside_strings(doc_gen):
+    code = (
+        'const glob = "src/**/*.js";\n'
+        'const lib = "lib/*";  // */\n'
+        '/* comentário\n   de bloco */\n'
+        'run(glob, lib);\n'
+    )
+    
+    compacted = doc_gen._compact_code(code, "JavaScript", max_tokens=1)
+    
+    assert 'const glob = "src/**/*.js";' in compacted
+    assert 'const lib = "lib/*";  // */' in compacted
+    assert "run(glob, lib);" in compacted
+    assert "comentário" not in compacted
+
+
+def test_compact_code_only_deduplicates_header_imports(doc_gen):
+    code = (
+        "using System;\n"
+        "using System;\n"
+        "\n"
+        "class A {\n"
+        "    void F() {\n"
+        "        using (var s = Open()) { s.Read(); }\n"
+        "        using (var s = Open()) { s.Read(); }\n"
+        "    }\n"
+        "}\n"
+    )
+    
+    compacted = doc_gen._compact_code(code, "C#", max_tokens=1)
+    
+    assert compacted.count("using System;") == 1
+    assert compacted.count("using (var s = Open())") == 2
+
+
+def test_read_sources_falls_back_to_truncation_when_compaction_fails(doc_gen, tmp_path, monkeypatch):
+    project = _write_project(tmp_path / "proj", {"a.py": "a = 1\n", "b.py": "b = 2\n"})
+    
+    def broken_compact(code, language, max_tokens=None):
+        raise RuntimeError("falha inesperada")
+    
+    monkeypatch.setattr(doc_gen, "_compact_code", broken_compact)
+    
+    sources = doc_gen._read_sources([str(project / "a.py"), str(project / "b.py")])
+    
+    assert [(main.os.path.basename(path), code) for path, code, _ in sources] == [
+        ("a.py", "a = 1\n"),
+        ("b.py", "b = 2\n"),
+    ]
+
+
+def test_token_cache_stores_counts_and_skips_prompts(doc_gen, fake_llm, tmp_path):
+    project = _write_project(tmp_path / "proj", {"a.py": "a = 1\n"})
+    fake_llm(lambda kwargs: "doc")
+    doc_gen.requests_per_minute = 600
+    # Com agrupamento todos os arquivos são contados
+    doc_gen.files_per_request = 2
+    main._token_cache.clear()
+    
+    doc_gen.generate_project(str(project))
+    
+    # Apenas o código do arquivo é contado com cache; o prompt enviado ao LLM não
+    assert list(main._token_cache.values()) == [len("a = 1\n")]
+
+
+def test_token_bucket_waits_for_refill():
+    async def scenario():
+        bucket = main.TokenBucket(tpm=6000)
+        start = main.time.monotonic()
+        await bucket.acquire(6000)
+        burst = main.time.monotonic() - start
+        await bucket.acquire(10)
+        return burst, main.time.monotonic() - start
+    
+    burst, total = main.asyncio.run(scenario())
+    
+    # O balde começa cheio; depois reabastece 100 tokens por segundo
+    assert burst < 0.05
+    assert 0.08 <= total < 0.5
+
+
+def test_small_files_skip_tokenization_without_packing(doc_gen, fake_llm, tmp_path, monkeypatch):
+    project = _write_project(tmp_path / "proj", {f"m{i}.py": f"x{i} = {i}\n" for i in range(5)})
+    fake_llm(lambda kwargs: "doc")
+    encoded = []
+    encoder = doc_gen.tokenizer
+    monkeypatch.setattr(encoder, "encode_ordinary", lambda text: encoded.append(text) or [ord(c) for c in text])
+    monkeypatch.setattr(
+        encoder, "encode_ordinary_batch",
+        lambda texts, num_threads=8: encoded.extend(texts) or [[ord(c) for c in t] for t in texts]
+    )
+    main._token_cache.clear()
+    
+    docs = doc_gen.generate_project(str(project))
+    
+    assert len(docs) == 5
+    assert encoded == []
+
+
+def test_save_project_works_inside_running_event_loop(doc_gen, tmp_path):
+    output_dir = tmp_path / "docs"
+    
+    async def scenario():
+        # Ex.: chamado a partir de uma aplicação assíncrona ou do Jupyter
+        doc_gen.save_project({"a.py": "doc a", "pkg/b.py": "doc b"}, str(output_dir))
+    
+    main.asyncio.run(scenario())
+    
+    assert (output_dir / "a.md").read_text(encoding="utf-8") == "doc a"
+    assert (output_dir / "pkg" / "b.md").read_text(encoding="utf-8") == "doc b"
+
+
+def test_generate_reuses_disk_cache_across_instances(doc_gen, fake_sync_llm, tmp_path, monkeypatch):
+    project = _write_project(tmp_path / "proj", {"a.py": "a = 1\n"})
+    client = fake_sync_llm(respond=lambda kwargs: "doc de a")
+    
+    assert doc_gen.generate(str(project / "a.py")) == "doc de a"
+    assert doc_gen.generate(str(project / "a.py")) == "doc de a"
+    assert len(client.calls) == 1
+    
+    # Outra instância com o mesmo diretório de cache não chama o LLM
+    other = main.DocGenerator(api_key="test", cache_dir=str(doc_gen._cache_dir))
+    monkeypatch.setattr(other, "_get_client", lambda: pytest.fail("o LLM não deveria ser chamado"))
+    assert other.generate(str(project / "a.py")) == "doc de a"
+
+
+def test_cache_put_leaves_no_partial_files_on_failure(doc_gen, monkeypatch):
+    def failing_replace(src, dst):
+        raise OSError("disco cheio")
+    
+    monkeypatch.setattr(main.os, "replace", failing_replace)
+    doc_gen._cache_put("chave", "conteúdo")
+    
+    assert doc_gen._cache_get("chave") is None
+    assert list(doc_gen._cache_dir.iterdir()) == []
+
+
+def test_generate_project_batch_maps_results_by_custom_id(doc_gen, fake_sync_llm, tmp_path):
+    project = _write_project(tmp_path / "proj", {"a.py": "a = 1\n", "b.py": "b = 2\n", "pkg/c.py": "c = 3\n"})
+    
+    def result(custom_id, status_code=200, content=None, error=None):
+        body = {"choices": [{"message": {"content": content}}]} if content else {"error": "falha"}
+        return json.dumps({
+            "custom_id": custom_id,
+            "response": {"status_code": status_code, "body": body},
+            "error": error,
+        })
+    
+    # Saída fora de ordem, com um erro e sem resultado para pkg/c.py
+    batch_output = "\n".join([
+        result("b.py", status_code=500),
+        "",
+        result("a.py", content="doc de a"),
+    ])
+    client = fake_sync_llm(batch_output=batch_output)
+    
+    docs = doc_gen.generate_project_batch(str(project), poll_interval=0)
+    
+    assert docs == {"a.py": "doc de a"}
+    custom_ids = sorted(json.loads(line)["custom_id"] for line in client.uploads[0].splitlines())
+    assert custom_ids == ["a.py", "b.py", main.os.path.join("pkg", "c.py")]
+    
+    # Apenas o resultado bem-sucedido vai para o cache e não é reenviado
+    client = fake_sync_llm(batch_output="")
+    docs = doc_gen.generate_project_batch(str(project), poll_interval=0)
+    assert docs == {"a.py": "doc de a"}
+    assert len(client.uploads[0].splitlines()) == 2
+
+
+def test_markdown_index_links_file_names_to_docs(doc_gen, tmp_path):
+    doc_gen._create_index(["a.py", main.os.path.join("pkg", "b.py")], str(tmp_path))
+    
+    index = (tmp_path / "index.md").read_text(encoding="utf-8")
+    
+    assert "- [a.py](a.md)" in index
+    assert f"- [b.py]({main.os.path.join('pkg', 'b.md')})" in index
+    assert "## pkg" in index